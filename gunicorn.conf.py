@@ -0,0 +1,43 @@
+"""
+Gunicorn Configuration
+
+Gunicorn loads this file from the working directory at startup.
+"""
+import math
+import os
+
+
+def available_cpus():
+    """Returns the CPUs this container may use, honouring a cgroup CPU limit
+
+    multiprocessing.cpu_count() reports every core of the host, so a pod
+    limited to one CPU on a large node would start far too many workers.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:  # macOS and Windows have no affinity mask or cgroups
+        return os.cpu_count() or 1
+    try:  # cgroup v2
+        with open("/sys/fs/cgroup/cpu.max", encoding="utf-8") as cpu_max:
+            quota, period = cpu_max.read().split()
+    except (OSError, ValueError):
+        try:  # cgroup v1
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", encoding="utf-8") as quota_file, \
+                    open("/sys/fs/cgroup/cpu/cpu.cfs_period_us", encoding="utf-8") as period_file:
+                quota, period = quota_file.read().strip(), period_file.read().strip()
+        except OSError:
+            return cpus
+    if quota in ("max", "-1"):
+        return cpus
+    return max(1, min(cpus, math.ceil(int(quota) / int(period))))
+
+
+# The request handlers are synchronous and spend most of their time waiting
+# on the database, so plain sync workers are the best fit. Running too few
+# of them is the usual Flask bottleneck, so default to (2 x CPU) + 1.
+workers = int(os.getenv("GUNICORN_WORKERS", available_cpus() * 2 + 1))
+worker_class = "sync"
+# Also read by service.config to size each worker's connection pool
+threads = int(os.getenv("GUNICORN_THREADS", "1"))
+# Only used by the async worker classes, kept so switching is a one-liner
+worker_connections = 1000
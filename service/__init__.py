@@ -7,7 +7,8 @@ and SQL database
 import sys
 from flask import Flask
 from service import config
-from service.common import log_handlers
+from service.common import log_handlers, cache
+from service.common.json_provider import AccountJSONProvider
 from flask_talisman import Talisman
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
@@ -16,6 +17,9 @@ from flask_cors import CORS
 app = Flask(__name__)
 app.config.from_object(config)
 
+# Use orjson for request parsing and jsonify()
+app.json = AccountJSONProvider(app)
+
 talisman = Talisman(app)
 
 db = SQLAlchemy(app)
@@ -32,6 +36,9 @@ from service.common import error_handlers, cli_commands  # noqa: F401 E402
 # Set up logging for production
 log_handlers.init_logging(app, "gunicorn.error")
 
+# Set up response caching if Redis is configured
+cache.init_cache(app)
+
 app.logger.info(70 * "*")
 msg = "  A C C O U N T   S E R V I C E   R U N N I N G  ".center(70, "*")
 app.logger.info(msg)
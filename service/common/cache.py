@@ -0,0 +1,118 @@
+"""
+Response Cache
+
+This module contains a Redis backed cache for GET responses. Caching is
+disabled unless REDIS_URI is configured. Redis errors are logged and
+never fail a request: reads fall through to the view and failed writes
+still return the response.
+"""
+import random
+import time
+from functools import wraps
+from flask import Response, current_app, make_response, request
+from redis import Redis, RedisError
+from . import status
+
+KEY_PREFIX = "cache:"
+MAX_JITTER_MS = 1000
+# Seconds to wait on Redis before giving up and skipping the cache
+REDIS_TIMEOUT = 0.5
+
+redis_client = None  # pylint: disable=invalid-name
+
+
+def init_cache(app):
+    """Connect to Redis if the application is configured to use it"""
+    global redis_client  # pylint: disable=global-statement, invalid-name
+    redis_uri = app.config.get("REDIS_URI")
+    if not redis_uri:
+        app.logger.info("REDIS_URI not set: response caching disabled")
+        redis_client = None
+        return
+    redis_client = Redis.from_url(
+        redis_uri,
+        socket_timeout=REDIS_TIMEOUT,
+        socket_connect_timeout=REDIS_TIMEOUT,
+    )
+    app.logger.info("Response caching enabled")
+
+
+def cache_response(ttl=10):
+    """Caches successful responses of the decorated view for ttl seconds"""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if redis_client is None:
+                return view(*args, **kwargs)
+
+            key = KEY_PREFIX + request.full_path
+            try:
+                cached = _cached_response(key)
+            except RedisError as error:
+                current_app.logger.warning("Cache read failed: %s", error)
+                return view(*args, **kwargs)
+            if cached is not None:
+                # answers If-None-Match with a 304 when the ETag matches
+                return cached.make_conditional(request)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == status.HTTP_200_OK:
+                _store(key, response, ttl)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _cached_response(key):
+    """Returns the Response cached under key, or None on a cache miss"""
+    cached = redis_client.hgetall(key)
+    if not cached:
+        return None
+    response = Response(
+        cached[b"body"],
+        status=int(cached[b"code"]),
+        content_type=cached[b"content_type"].decode(),
+    )
+    if cached.get(b"etag"):
+        response.headers["ETag"] = cached[b"etag"].decode()
+    return response
+
+
+def _store(key, response, ttl):
+    """Caches a response under key for ttl seconds plus some jitter"""
+    now = time.time()
+    ttl_ms = ttl * 1000 + random.randint(0, MAX_JITTER_MS)
+    pipe = redis_client.pipeline()
+    pipe.hset(
+        key,
+        mapping={
+            "generated_at": now,
+            "stale_at": now + ttl,
+            "content_type": response.content_type,
+            "etag": response.headers.get("ETag", ""),
+            "code": response.status_code,
+            "body": response.get_data(),
+        },
+    )
+    pipe.pexpire(key, ttl_ms)
+    try:
+        pipe.execute()
+    except RedisError as error:
+        current_app.logger.warning("Cache write failed: %s", error)
+
+
+def invalidate(*paths):
+    """Removes the cached responses for each path without a query string
+
+    Responses cached for a path with a query string are left to expire on
+    their own ttl, finding them would need a SCAN of the whole keyspace.
+    """
+    if redis_client is None:
+        return
+    try:
+        redis_client.delete(*(f"{KEY_PREFIX}{path}?" for path in paths))
+    except RedisError as error:
+        current_app.logger.warning("Cache invalidation failed: %s", error)
@@ -1,11 +1,29 @@
 """
 Module: error_handlers
 """
-from flask import jsonify
+import orjson
+from flask import Response
+from werkzeug.exceptions import NotFound
 from service.models import DataValidationError
 from service import app
 from . import status
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+class AccountNotFound(NotFound):
+    """Raised by the routes when an Account does not exist"""
+
+
+# Encoded once, nothing about a missing Account varies per request
+ACCOUNT_NOT_FOUND_BODY = orjson.dumps({"error": "Account not found"})
+
+
+def error_response(code, error, message):
+    """Builds a JSON error response"""
+    body = orjson.dumps({"status": code, "error": error, "message": message})
+    return Response(body, code, JSON_HEADERS)
+
 
 ######################################################################
 # Error Handlers
@@ -21,14 +39,15 @@ def bad_request(error):
     """Handles bad requests with 400_BAD_REQUEST"""
     message = str(error)
     app.logger.warning(message)
-    return (
-        jsonify(
-            status=status.HTTP_400_BAD_REQUEST,
-            error="Bad Request",
-            message=message
-        ),
-        status.HTTP_400_BAD_REQUEST,
-    )
+    return error_response(status.HTTP_400_BAD_REQUEST, "Bad Request", message)
+
+
+@app.errorhandler(AccountNotFound)
+def account_not_found(error):
+    """Handles Accounts not found with 404_NOT_FOUND"""
+    app.logger.warning(str(error))
+    # a new Response each time, the after_request hooks add per-request headers
+    return Response(ACCOUNT_NOT_FOUND_BODY, status.HTTP_404_NOT_FOUND, JSON_HEADERS)
 
 
 @app.errorhandler(status.HTTP_404_NOT_FOUND)
@@ -36,13 +55,7 @@ def not_found(error):
     """Handles resources not found with 404_NOT_FOUND"""
     message = str(error)
     app.logger.warning(message)
-    return (
-        jsonify(
-            status=status.HTTP_404_NOT_FOUND,
-            error="Not Found",
-            message=message),
-        status.HTTP_404_NOT_FOUND,
-    )
+    return error_response(status.HTTP_404_NOT_FOUND, "Not Found", message)
 
 
 @app.errorhandler(status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -50,13 +63,8 @@ def method_not_supported(error):
     """Handles unsupported HTTP methods with 405_METHOD_NOT_SUPPORTED"""
     message = str(error)
     app.logger.warning(message)
-    return (
-        jsonify(
-            status=status.HTTP_405_METHOD_NOT_ALLOWED,
-            error="Method not Allowed",
-            message=message,
-        ),
-        status.HTTP_405_METHOD_NOT_ALLOWED,
+    return error_response(
+        status.HTTP_405_METHOD_NOT_ALLOWED, "Method not Allowed", message
     )
 
 
@@ -65,13 +73,8 @@ def mediatype_not_supported(error):
     """Handles unsupported media requests with 415_UNSUPPORTED_MEDIA_TYPE"""
     message = str(error)
     app.logger.warning(message)
-    return (
-        jsonify(
-            status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-            error="Unsupported media type",
-            message=message,
-        ),
-        status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+    return error_response(
+        status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, "Unsupported media type", message
     )
 
 
@@ -80,11 +83,6 @@ def internal_server_error(error):
     """Handles unexpected server error with 500_SERVER_ERROR"""
     message = str(error)
     app.logger.error(message)
-    return (
-        jsonify(
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            error="Internal Server Error",
-            message=message,
-        ),
-        status.HTTP_500_INTERNAL_SERVER_ERROR,
+    return error_response(
+        status.HTTP_500_INTERNAL_SERVER_ERROR, "Internal Server Error", message
     )
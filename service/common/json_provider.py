@@ -0,0 +1,13 @@
+"""
+JSON Provider
+
+This module contains the orjson based JSON provider used by the app
+"""
+import orjson
+from flask_orjson import OrjsonProvider
+
+
+class AccountJSONProvider(OrjsonProvider):
+    """Encodes dates and naive datetimes natively as UTC with orjson"""
+
+    option = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
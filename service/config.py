@@ -20,6 +20,13 @@ if not DATABASE_URI:
 # Configure SQLAlchemy
 SQLALCHEMY_DATABASE_URI = DATABASE_URI
 SQLALCHEMY_TRACK_MODIFICATIONS = False
+# Request threads per Gunicorn worker, sizes each worker's connection pool
+WORKER_THREADS = int(os.getenv("GUNICORN_THREADS", "1"))
+# Room for every compiled statement the service uses to stay cached
+SQLALCHEMY_ENGINE_OPTIONS = {"query_cache_size": 1200}
+
+# Redis used for response caching (caching is disabled when not set)
+REDIS_URI = os.getenv("REDIS_URI")
 
 # Secret for session management
 SECRET_KEY = os.getenv("SECRET_KEY", "s3cr3t-key-shhhh")
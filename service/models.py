@@ -5,21 +5,149 @@ All of the models are stored in this module
 """
 import logging
 from datetime import date
+import orjson
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DateTime, inspect, literal_column, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
 
 logger = logging.getLogger("flask.app")
 
+# The Account fields kept in serialized_json, in serialize() order
+SERIALIZED_FIELDS = ("name", "email", "address", "phone_number", "date_joined")
+# Fields stored as text, serialized_json is built from the values as sent
+# so they must already be what the database would store
+TEXT_FIELDS = ("name", "email", "address", "phone_number")
+
+
+class ServiceSQLAlchemy(SQLAlchemy):
+    """SQLAlchemy with engine options tuned for the service's database"""
+
+    def apply_driver_hacks(self, app, sa_url, options):
+        """Adds PostgreSQL driver options before the engine is created"""
+        sa_url, options = super().apply_driver_hacks(app, sa_url, options)
+        if sa_url.drivername.startswith("postgresql"):
+            # batch executemany() INSERTs and UPDATEs at the driver level
+            options.setdefault("executemany_mode", "values_plus_batch")
+            # the pool is per worker process, so one connection for each
+            # of its request threads plus the same again for bursts
+            threads = app.config.get("WORKER_THREADS", 1)
+            options.setdefault("pool_size", threads)
+            options.setdefault("max_overflow", threads)
+            # stale connections are replaced by pool_recycle instead of a
+            # SELECT 1 on every checkout
+            options.setdefault("pool_pre_ping", False)
+            options.setdefault("pool_recycle", 1800)
+        return sa_url, options
+
+
 # Create the SQLAlchemy object to be initialized later in init_db()
-db = SQLAlchemy()
+db = ServiceSQLAlchemy()
 
 
 class DataValidationError(Exception):
     """Used for an data validation errors when deserializing"""
 
 
+class utcnow(FunctionElement):  # pylint: disable=invalid-name, too-many-ancestors
+    """The database server's current time in UTC as a naive timestamp"""
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(_element, _compiler, **_kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "postgresql")
+def _utcnow_postgresql(_element, _compiler, **_kw):
+    # statement_timestamp() moves on inside a transaction, now() does not
+    return "TIMEZONE('utc', statement_timestamp())"
+
+
+@compiles(utcnow, "sqlite")
+def _utcnow_sqlite(_element, _compiler, **_kw):
+    # %f is only milliseconds, pad it to the microseconds SQLAlchemy reads
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
 def init_db(app):
     """Initialize the SQLAlchemy app"""
     Account.init_db(app)
+    upgrade_db(db.get_engine(app))
+
+
+def check_text_fields(fields):
+    """Raises a DataValidationError unless each text field given is a string
+
+    Args:
+        fields (dict): Account fields, fields that are missing are skipped
+    """
+    for name in TEXT_FIELDS:
+        if name not in fields:
+            continue
+        value = fields[name]
+        if value is None and name == "phone_number":  # phone number is optional
+            continue
+        if not isinstance(value, str):
+            raise DataValidationError(f"Invalid Account: {name} must be a string")
+
+
+def serialize_fields(fields):
+    """Encodes an Account's fields for its serialized_json column
+
+    The id is left out so the JSON can be built before the INSERT that
+    assigns it, account_json() puts it back in when the row is read.
+    """
+    return orjson.dumps({name: fields[name] for name in SERIALIZED_FIELDS})
+
+
+def account_json(account_id, serialized_json):
+    """Returns the full JSON of an Account from its id and serialized_json"""
+    return b'{"id":%d,%s' % (account_id, serialized_json[1:])
+
+
+def upgrade_db(engine):
+    """Adds the Account columns that create_all() cannot add to an old table
+
+    Safe to run on every start: columns that exist are left alone, and
+    PostgreSQL's IF NOT EXISTS covers workers that start at the same time.
+    """
+    table = Account.__table__
+    # the value that existing rows get for each added column, None keeps
+    # the column nullable
+    backfills = {
+        table.c.updated_at: utcnow(),
+        table.c.serialized_json: None,
+        table.c.version: 1,
+    }
+    existing = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    missing = [column for column in backfills if column.name not in existing]
+    if not missing:
+        return
+    postgresql = engine.dialect.name == "postgresql"
+    with engine.begin() as conn:
+        for column in missing:
+            logger.info("Adding column %s.%s", table.name, column.name)
+            conn.execute(text(
+                f"ALTER TABLE {table.name} ADD COLUMN "
+                f"{'IF NOT EXISTS ' if postgresql else ''}{column.name} "
+                f"{column.type.compile(dialect=engine.dialect)}"
+            ))
+        for column in missing:
+            if backfills[column] is None:
+                continue
+            conn.execute(
+                table.update()
+                .where(column.is_(None))
+                .values({column: backfills[column]})
+            )
+            if postgresql:  # SQLite cannot add NOT NULL to a column
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} ALTER COLUMN {column.name} SET NOT NULL"
+                ))
 
 
 ######################################################################
@@ -37,6 +165,7 @@ class PersistentBase:
         """
         logger.info("Creating %s", self.name)
         self.id = None  # id must be none to generate next primary key
+        self.refresh_serialized_json()
         db.session.add(self)
         db.session.commit()
 
@@ -45,6 +174,7 @@ class PersistentBase:
         Updates a Account to the database
         """
         logger.info("Updating %s", self.name)
+        self.refresh_serialized_json()
         db.session.commit()
 
     def delete(self):
@@ -58,9 +188,12 @@ class PersistentBase:
         """Initializes the database session"""
         logger.info("Initializing database")
         cls.app = app
-        # This is where we initialize SQLAlchemy from the Flask app
-        db.init_app(app)
-        app.app_context().push()
+        # This is where we initialize SQLAlchemy from the Flask app, only
+        # once since the app refuses new setup after its first request
+        state = app.extensions.get("sqlalchemy")
+        if state is None or state.db is not db:
+            db.init_app(app)
+            app.app_context().push()
         db.create_all()  # make our sqlalchemy tables
 
     @classmethod
@@ -73,7 +206,7 @@ class PersistentBase:
     def find(cls, by_id):
         """Finds a record by it's ID"""
         logger.info("Processing lookup for id %s ...", by_id)
-        return cls.query.get(by_id)
+        return db.session.get(cls, by_id)
 
 
 ######################################################################
@@ -94,6 +227,24 @@ class Account(db.Model, PersistentBase):
     # phone number is optional
     phone_number = db.Column(db.String(32), nullable=True)
     date_joined = db.Column(db.Date(), nullable=False, default=date.today())
+    # Set from the database clock so that app servers with skewed clocks
+    # cannot move it backwards
+    updated_at = db.Column(
+        db.DateTime(),
+        nullable=False,
+        default=utcnow(),
+        onupdate=utcnow(),
+    )
+    # Goes up by one on every UPDATE, used to build the list's ETag
+    version = db.Column(
+        db.Integer(),
+        nullable=False,
+        default=1,
+        onupdate=literal_column("version + 1"),
+    )
+    # JSON encoding of serialize() without the id, kept up to date on
+    # every write
+    serialized_json = db.Column(db.LargeBinary(), nullable=True)
 
     def __repr__(self):
         return f"<Account {self.name} id=[{self.id}]>"
@@ -106,9 +257,19 @@ class Account(db.Model, PersistentBase):
             "email": self.email,
             "address": self.address,
             "phone_number": self.phone_number,
-            "date_joined": self.date_joined.isoformat()
+            # left as a date, the JSON provider encodes it natively
+            "date_joined": self.date_joined
         }
 
+    def refresh_serialized_json(self):
+        """Stores the JSON encoding of the Account for fast reads
+
+        Returns:
+            bytes: the new serialized_json
+        """
+        self.serialized_json = serialize_fields(self.serialize())
+        return self.serialized_json
+
     def deserialize(self, data):
         """
         Deserializes a Account from a dictionary
@@ -117,12 +278,15 @@ class Account(db.Model, PersistentBase):
             data (dict): A dictionary containing the resource data
         """
         try:
+            check_text_fields(data)
             self.name = data["name"]
             self.email = data["email"]
             self.address = data["address"]
             self.phone_number = data.get("phone_number")
             date_joined = data.get("date_joined")
-            if date_joined:
+            if isinstance(date_joined, date):
+                self.date_joined = date_joined
+            elif date_joined:
                 self.date_joined = date.fromisoformat(date_joined)
             else:
                 self.date_joined = date.today()
@@ -134,6 +298,10 @@ class Account(db.Model, PersistentBase):
                 "Invalid Account: body of request contained "
                 "bad or no data - " + error.args[0]
             ) from error
+        except ValueError as error:
+            raise DataValidationError(
+                "Invalid Account: date_joined must be a YYYY-MM-DD date"
+            ) from error
         return self
 
     @classmethod
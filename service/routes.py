@@ -6,11 +6,44 @@ This microservice handles the lifecycle of Accounts
 
 # pylint: disable=unused-import
 from flask import jsonify, request, make_response, abort, url_for   # noqa; F401
-from service.models import Account
+from flask import Response
+from werkzeug.http import generate_etag
+import orjson
+from service.models import Account, DataValidationError, db
+from service.models import SERIALIZED_FIELDS, account_json, check_text_fields, serialize_fields
 from service.common import status  # HTTP Status Codes
+from service.common.cache import cache_response, invalidate
+from service.common.error_handlers import AccountNotFound, JSON_HEADERS
 from . import app  # Import Flask application
 from datetime import datetime
 
+# Columns returned for an Account, in serialize() order
+ACCOUNT_COLUMNS = (
+    Account.id,
+    Account.name,
+    Account.email,
+    Account.address,
+    Account.phone_number,
+    Account.date_joined,
+)
+# Fields that a client is allowed to change with PUT
+UPDATABLE_FIELDS = set(SERIALIZED_FIELDS)
+# Most Accounts that one POST /accounts/bulk request may create
+MAX_BULK_ACCOUNTS = 1000
+
+# Static JSON bodies are encoded once at import time
+_DELETED = (
+    orjson.dumps({"message": "Account deleted successfully"}),
+    status.HTTP_200_OK,
+    JSON_HEADERS,
+)
+
+# The health and index bodies never change so they are encoded once, each
+# request still gets its own Response because the after_request hooks
+# (Talisman, CORS) set per-request headers on it
+_HEALTH_BODY = orjson.dumps({"status": "OK"})
+_INDEX_BODY = orjson.dumps({"name": "Account REST API Service", "version": "1.0"})
+
 
 ############################################################
 # Health Endpoint
@@ -18,7 +51,7 @@ from datetime import datetime
 @app.route("/health")
 def health():
     """Health Status"""
-    return jsonify(dict(status="OK")), status.HTTP_200_OK
+    return Response(_HEALTH_BODY, status.HTTP_200_OK, JSON_HEADERS)
 
 
 ######################################################################
@@ -27,14 +60,7 @@ def health():
 @app.route("/")
 def index():
     """Root URL response"""
-    return (
-        jsonify(
-            name="Account REST API Service",
-            version="1.0",
-            # paths=url_for("list_accounts", _external=True),
-        ),
-        status.HTTP_200_OK,
-    )
+    return Response(_INDEX_BODY, status.HTTP_200_OK, JSON_HEADERS)
 
 
 ######################################################################
@@ -51,40 +77,128 @@ def create_accounts():
     check_content_type("application/json")
     account = Account()
     account.deserialize(request.get_json())
-    account.create()
-    message = account.serialize()
-    # Uncomment once get_accounts has been implemented
-    # location_url =
-    # url_for("get_accounts", account_id=account.id, _external=True)
-    location_url = "/"  # Remove once get_accounts has been implemented
-    return make_response(
-        jsonify(message), status.HTTP_201_CREATED, {"Location": location_url}
+    # Keep the id and JSON in locals, commit() expires them on the Account
+    # and reading them back would cost another SELECT
+    serialized_json = account.refresh_serialized_json()
+    db.session.add(account)
+    db.session.flush()  # the INSERT assigns the id
+    account_id = account.id
+    db.session.commit()
+    invalidate("/accounts")
+    location_url = url_for("get_account", id=account_id, _external=True)
+    return Response(
+        account_json(account_id, serialized_json),
+        status.HTTP_201_CREATED,
+        {**JSON_HEADERS, "Location": location_url},
     )
 
 
+######################################################################
+# CREATE ACCOUNTS IN BULK
+######################################################################
+@app.route("/accounts/bulk", methods=["POST"])
+def create_accounts_bulk():
+    """
+    Creates many Accounts
+    This endpoint will create all of the Accounts in the posted
+    JSON array in a single transaction
+    """
+    app.logger.info("Request to create Accounts in bulk")
+    check_content_type("application/json")
+    payload = request.get_json()
+    if not isinstance(payload, list):
+        raise DataValidationError(
+            "Invalid request: body must be a JSON array of Accounts"
+        )
+    if len(payload) > MAX_BULK_ACCOUNTS:
+        raise DataValidationError(
+            f"Invalid request: at most {MAX_BULK_ACCOUNTS} Accounts per request"
+        )
+    mappings = []
+    for data in payload:
+        account = Account().deserialize(data)
+        mapping = {field: getattr(account, field) for field in SERIALIZED_FIELDS}
+        mapping["serialized_json"] = serialize_fields(mapping)
+        mappings.append(mapping)
+    db.session.bulk_insert_mappings(Account, mappings, return_defaults=True)
+    db.session.commit()
+    invalidate("/accounts")
+    # return_defaults puts the generated id back into each mapping, join
+    # the stored bytes instead of encoding every Account again
+    body = b"[" + b",".join(
+        account_json(mapping["id"], mapping["serialized_json"])
+        for mapping in mappings
+    ) + b"]"
+    return Response(body, status.HTTP_201_CREATED, JSON_HEADERS)
+
+
 ######################################################################
 # LIST ALL ACCOUNTS
 ######################################################################
 @app.route("/accounts", methods=["GET"])
+@cache_response(ttl=10)
 def list_accounts():
     """List all accounts"""
-    accounts = Account.all()
-    account_list = [account.serialize() for account in accounts]
-    return jsonify(account_list), 200
+    if request.if_none_match:
+        # A cheap aggregate can answer a conditional GET without the rows
+        count, id_sum, version_sum = db.session.execute(
+            db.select(
+                db.func.count(Account.id),
+                db.func.coalesce(db.func.sum(Account.id), 0),
+                db.func.coalesce(db.func.sum(Account.version), 0),
+            )
+        ).one()
+        etag = f"{count}-{id_sum}-{version_sum}"
+        if request.if_none_match.contains_weak(etag):
+            return _not_modified(etag)
+
+    # Project only the serialized columns instead of hydrating ORM objects
+    rows = db.session.execute(
+        db.select(*ACCOUNT_COLUMNS, Account.version)
+    ).mappings().all()
+    account_list = [
+        {column.key: row[column.key] for column in ACCOUNT_COLUMNS}
+        for row in rows
+    ]
+    id_sum = sum(row["id"] for row in rows)
+    version_sum = sum(row["version"] for row in rows)
+    etag = f"{len(rows)}-{id_sum}-{version_sum}"
+    # Encode straight to bytes, jsonify adds nothing for a plain list
+    response = Response(
+        orjson.dumps(account_list), status.HTTP_200_OK, JSON_HEADERS
+    )
+    response.set_etag(etag, weak=True)
+    return response
 
 
 ######################################################################
 # READ AN ACCOUNT
 ######################################################################
 @app.route('/accounts/<int:id>', methods=['GET'])
+@cache_response(ttl=10)
 def get_account(id):
     """Fetch an account by ID"""
-    account = Account.query.get(id)
-    if account:
-        return jsonify(account.serialize()), 200
+    # Stream the JSON stored at write time instead of serializing the row
+    serialized_json = db.session.execute(
+        db.select(Account.serialized_json).where(Account.id == id)
+    ).one_or_none()
+    if serialized_json is None:
+        raise AccountNotFound()
+
+    if serialized_json[0] is None:
+        # cleared by a partial PUT, or the row was not written by this service
+        body = orjson.dumps(dict(db.session.execute(
+            db.select(*ACCOUNT_COLUMNS).where(Account.id == id)
+        ).mappings().one()))
     else:
-        # Change error message to match test expectation
-        return jsonify({"error": "Account not found"}), 404
+        body = account_json(id, serialized_json[0])
+    # A hash of the body changes exactly when the Account does
+    etag = generate_etag(body)
+    if request.if_none_match.contains_weak(etag):
+        return _not_modified(etag)
+    response = Response(body, status.HTTP_200_OK, JSON_HEADERS)
+    response.set_etag(etag, weak=True)
+    return response
 
 
 ######################################################################
@@ -93,29 +207,44 @@ def get_account(id):
 @app.route('/accounts/<int:id>', methods=['PUT'])
 def update_account(id):
     """Update an Account"""
-    account = Account.query.get(id)
-    if not account:
-        return jsonify({"error": "Account not found"}), status.HTTP_404_NOT_FOUND
-
     # Deserialize the incoming request data
     data = request.get_json()
+    if not isinstance(data, dict):
+        raise DataValidationError("Invalid request: body must be a JSON object")
 
     # Ensure that date_joined is a datetime.date object, not a string
     if 'date_joined' in data:
         try:
             data['date_joined'] = datetime.strptime(data['date_joined'], '%Y-%m-%d').date()  # Convert to date
-        except ValueError:
-            return jsonify({"error": "Invalid date format. Expected YYYY-MM-DD."}), status.HTTP_400_BAD_REQUEST
-
-    # Update the account fields with the data
-    account.name = data.get("name", account.name)
-    account.email = data.get("email", account.email)
-    account.address = data.get("address", account.address)
-    account.phone_number = data.get("phone_number", account.phone_number)
-    account.date_joined = data.get("date_joined", account.date_joined)
+        except (TypeError, ValueError) as error:
+            raise DataValidationError(
+                "Invalid date format. Expected YYYY-MM-DD."
+            ) from error
 
-    account.update()  # Save changes to the database
-    return jsonify(account.serialize()), status.HTTP_200_OK
+    values = {key: data[key] for key in UPDATABLE_FIELDS if key in data}
+    check_text_fields(values)
+    if values.keys() == UPDATABLE_FIELDS:
+        # Every field was sent, so the stored JSON goes in the same UPDATE
+        serialized_json = serialize_fields(values)
+        result = db.session.execute(
+            db.update(Account)
+            .where(Account.id == id)
+            .values(serialized_json=serialized_json, **values)
+        )
+        if result.rowcount == 0:
+            raise AccountNotFound()
+        body = account_json(id, serialized_json)
+    else:
+        # Building the stored JSON would need the columns that were not
+        # sent, so the UPDATE clears it and get_account rebuilds it from
+        # the row until the next full write
+        row = _update_account_row(id, values)
+        if row is None:
+            raise AccountNotFound()
+        body = orjson.dumps(dict(row))
+    db.session.commit()  # Save changes to the database
+    invalidate("/accounts", f"/accounts/{id}")
+    return Response(body, status.HTTP_200_OK, JSON_HEADERS)
 
 
 ######################################################################
@@ -124,24 +253,53 @@ def update_account(id):
 @app.route("/accounts/<int:account_id>", methods=["DELETE"])
 def delete_account(account_id):
     """Delete an account by ID"""
-    account = Account.find(account_id)
+    account = db.session.get(Account, account_id)
     if not account:
-        return jsonify({"error": "Account not found"}), 404
+        raise AccountNotFound()
 
     account.delete()
-    return jsonify({"message": "Account deleted successfully"}), 200
+    invalidate("/accounts", f"/accounts/{account_id}")
+    return Response(*_DELETED)
 
 
 ######################################################################
 #  U T I L I T Y   F U N C T I O N S
 ######################################################################
 
+def _update_account_row(account_id, values):
+    """Updates an Account row and returns its new columns, or None if missing"""
+    where = Account.id == account_id
+    if not values:
+        return db.session.execute(
+            db.select(*ACCOUNT_COLUMNS).where(where)
+        ).mappings().one_or_none()
+
+    stmt = db.update(Account).where(where).values(serialized_json=None, **values)
+    if db.engine.dialect.full_returning:
+        return db.session.execute(
+            stmt.returning(*ACCOUNT_COLUMNS)
+        ).mappings().one_or_none()
+
+    # SQLite has no RETURNING support in SQLAlchemy 1.4 so read the row back
+    if db.session.execute(stmt).rowcount == 0:
+        return None
+    return db.session.execute(
+        db.select(*ACCOUNT_COLUMNS).where(where)
+    ).mappings().one()
+
+
+def _not_modified(etag):
+    """Returns an empty 304_NOT_MODIFIED response for a weak ETag"""
+    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    response.set_etag(etag, weak=True)
+    return response
+
+
 def check_content_type(media_type):
     """Checks that the media type is correct"""
-    content_type = request.headers.get("Content-Type")
-    if content_type and content_type == media_type:
+    if request.mimetype == media_type:
         return
-    app.logger.error("Invalid Content-Type: %s", content_type)
+    app.logger.error("Invalid Content-Type: %s", request.content_type)
     abort(
         status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
         f"Content-Type must be {media_type}",
@@ -0,0 +1,63 @@
+"""
+Test Package
+
+The tests use an in-memory SQLite database unless DATABASE_URI is set.
+This has to happen before the service package is imported, because
+importing it connects to the database.
+
+setup_app() does the one-time app and database setup shared by every
+test class, so it only runs once per test process.
+
+Under pytest-xdist (pytest -n, see make tests-parallel) every worker gets
+its own database: in-memory SQLite is private to each process already,
+PostgreSQL gets one database per worker named after PYTEST_XDIST_WORKER.
+Those databases are kept on purpose and reused by the next run, which
+saves a CREATE DATABASE per worker. Worker names only go up to the most
+workers ever used, so at most that many databases pile up, and each test
+module empties its tables before it runs.
+"""
+import logging
+import os
+from functools import lru_cache
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+
+def worker_database_uri(uri, worker):
+    """Returns a database URI that is private to an xdist worker"""
+    url = make_url(uri)
+    if url.get_backend_name() != "postgresql":
+        return uri
+    name = f"{url.database}_{worker}"
+    engine = create_engine(url, isolation_level="AUTOCOMMIT")
+    with engine.connect() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM pg_database WHERE datname = :name"),
+            {"name": name},
+        ).scalar()
+        if not exists:
+            conn.execute(text(f'CREATE DATABASE "{name}"'))
+    engine.dispose()
+    return url.set(database=name).render_as_string(hide_password=False)
+
+
+@lru_cache(maxsize=None)
+def setup_app():
+    """Configures the service for testing and returns the Flask app"""
+    # pylint: disable=import-outside-toplevel
+    from service import app
+    from service.models import init_db
+
+    app.config["TESTING"] = True
+    app.config["DEBUG"] = False
+    app.config["SQLALCHEMY_DATABASE_URI"] = os.environ["DATABASE_URI"]
+    app.logger.setLevel(logging.CRITICAL)
+    init_db(app)
+    return app
+
+
+os.environ.setdefault("DATABASE_URI", "sqlite:///:memory:")
+if os.getenv("PYTEST_XDIST_WORKER"):
+    os.environ["DATABASE_URI"] = worker_database_uri(
+        os.environ["DATABASE_URI"], os.environ["PYTEST_XDIST_WORKER"]
+    )
@@ -0,0 +1,127 @@
+"""
+Test cases for the Response Cache
+"""
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+from flask import jsonify
+from redis import RedisError
+from service import app
+from service.common import cache, status
+
+
+@cache.cache_response(ttl=5)
+def cached_view():
+    """A view that is wrapped by the cache"""
+    return jsonify(name="fresh"), status.HTTP_200_OK
+
+
+class TestResponseCache(TestCase):
+    """Response Cache Tests"""
+
+    def setUp(self):
+        self.redis = MagicMock()
+        self.redis.hgetall.return_value = {}
+
+    def test_init_without_redis_uri(self):
+        """It should disable caching when REDIS_URI is not set"""
+        with patch.dict(app.config, {"REDIS_URI": None}):
+            cache.init_cache(app)
+        self.assertIsNone(cache.redis_client)
+
+    @patch("service.common.cache.Redis")
+    def test_init_with_redis_uri(self, redis_mock):
+        """It should connect to Redis when REDIS_URI is set"""
+        with patch.dict(app.config, {"REDIS_URI": "redis://localhost:6379"}):
+            cache.init_cache(app)
+        redis_mock.from_url.assert_called_once_with(
+            "redis://localhost:6379",
+            socket_timeout=cache.REDIS_TIMEOUT,
+            socket_connect_timeout=cache.REDIS_TIMEOUT,
+        )
+        cache.redis_client = None
+
+    def test_cache_disabled(self):
+        """It should call the view when caching is disabled"""
+        with app.test_request_context("/accounts"):
+            response = cached_view()
+        self.assertEqual(response[1], status.HTTP_200_OK)
+
+    def test_cache_miss(self):
+        """It should store the response on a cache miss"""
+        with patch.object(cache, "redis_client", self.redis):
+            with app.test_request_context("/accounts"):
+                response = cached_view()
+        self.assertEqual(response.get_json(), {"name": "fresh"})
+        self.redis.hgetall.assert_called_once_with("cache:/accounts?")
+        pipe = self.redis.pipeline.return_value
+        mapping = pipe.hset.call_args.kwargs["mapping"]
+        self.assertEqual(mapping["code"], status.HTTP_200_OK)
+        self.assertEqual(mapping["body"], response.get_data())
+        ttl_ms = pipe.pexpire.call_args.args[1]
+        self.assertGreaterEqual(ttl_ms, 5000)
+        pipe.execute.assert_called_once()
+
+    def test_cache_hit(self):
+        """It should return the cached response on a cache hit"""
+        self.redis.hgetall.return_value = {
+            b"code": b"200",
+            b"content_type": b"application/json",
+            b"body": b'{"name":"cached"}',
+        }
+        with patch.object(cache, "redis_client", self.redis):
+            with app.test_request_context("/accounts"):
+                response = cached_view()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.get_json(), {"name": "cached"})
+        self.redis.pipeline.assert_not_called()
+
+    def test_cache_hit_not_modified(self):
+        """It should return 304 on a cache hit with a matching ETag"""
+        self.redis.hgetall.return_value = {
+            b"code": b"200",
+            b"content_type": b"application/json",
+            b"etag": b'W/"1-2"',
+            b"body": b'{"name":"cached"}',
+        }
+        with patch.object(cache, "redis_client", self.redis):
+            with app.test_request_context(
+                "/accounts", headers={"If-None-Match": 'W/"1-2"'}
+            ):
+                response = cached_view()
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_cache_read_error(self):
+        """It should call the view when Redis cannot be read"""
+        self.redis.hgetall.side_effect = RedisError("connection refused")
+        with patch.object(cache, "redis_client", self.redis):
+            with app.test_request_context("/accounts"):
+                response = cached_view()
+        self.assertEqual(response[1], status.HTTP_200_OK)
+        self.redis.pipeline.assert_not_called()
+
+    def test_cache_write_error(self):
+        """It should return the response when Redis cannot be written"""
+        pipe = self.redis.pipeline.return_value
+        pipe.execute.side_effect = RedisError("connection refused")
+        with patch.object(cache, "redis_client", self.redis):
+            with app.test_request_context("/accounts"):
+                response = cached_view()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.get_json(), {"name": "fresh"})
+
+    def test_invalidate(self):
+        """It should delete the exact cached key of each path"""
+        with patch.object(cache, "redis_client", self.redis):
+            cache.invalidate("/accounts", "/accounts/1")
+        self.redis.delete.assert_called_once_with(
+            "cache:/accounts?", "cache:/accounts/1?"
+        )
+        self.redis.scan_iter.assert_not_called()
+
+    def test_invalidate_error(self):
+        """It should not raise when Redis cannot be reached to invalidate"""
+        self.redis.delete.side_effect = RedisError("connection refused")
+        with patch.object(cache, "redis_client", self.redis):
+            with app.app_context():
+                cache.invalidate("/accounts")
+        self.redis.delete.assert_called_once_with("cache:/accounts?")
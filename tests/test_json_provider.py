@@ -0,0 +1,21 @@
+"""
+Test cases for the JSON Provider
+"""
+from datetime import date, datetime
+from unittest import TestCase
+from service import app
+
+
+class TestJSONProvider(TestCase):
+    """JSON Provider Tests"""
+
+    def test_encode_dates(self):
+        """It should encode dates and naive datetimes natively"""
+        data = {
+            "date_joined": date(2025, 1, 1),
+            "updated_at": datetime(2025, 1, 1, 12, 30),
+        }
+        self.assertEqual(
+            app.json.dumps(data),
+            '{"date_joined":"2025-01-01","updated_at":"2025-01-01T12:30:00Z"}',
+        )